@@ -1,3 +1,6 @@
 from .main import app
 
-app(prog_name="clepon")
+# Guarded so parse workers started with the spawn method (macOS, Windows)
+# can re-import this module without launching the CLI again
+if __name__ == "__main__":
+    app(prog_name="clepon")
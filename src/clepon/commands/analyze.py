@@ -1,14 +1,10 @@
+import os
 from pathlib import Path
 
-import requests
 import typer
-from rich.console import Console
 
 from ..config import API_BASE_URL, CONFIG_FILENAME
-from ..services import read_token_from_toml
-
-console = Console()
-err_console = Console(stderr=True)
+from ..console import get_console, get_err_console
 
 app = typer.Typer()
 
@@ -16,6 +12,15 @@ app = typer.Typer()
 @app.command()
 def analyze():
     """Analyze the project and return a the project report as MD file"""
+    import tempfile
+
+    import requests
+
+    from ..services import get_session, read_token_from_toml
+
+    console = get_console()
+    err_console = get_err_console()
+
     console.print("🔍 Analyzing the project...")
 
     # Step 1: Check if clepon.toml exists
@@ -40,7 +45,7 @@ def analyze():
     # Step 3: Call the project report endpoint
     try:
         console.print("📊 Fetching project report from Clepon API...")
-        response = requests.post(
+        with get_session().post(
             f"{API_BASE_URL}/projects/{project_token}/report",
             json={
                 "llm_provider": "gemini",
@@ -49,14 +54,29 @@ def analyze():
                 "max_contexts": 100,
             },
             timeout=1800,
-        )
-        response.raise_for_status()
-        report_md = response.text
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+
+            # Step 4: Stream the report into a temporary file next to the
+            # markdown file, which is only replaced once the download is whole
+            report_path = pwd / "clepon_project_report.md"
+            tmp_file = tempfile.NamedTemporaryFile(
+                dir=pwd, prefix=".clepon_project_report.", delete=False
+            )
+            try:
+                with tmp_file:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        tmp_file.write(chunk)
 
-        # Step 4: Save the report as a markdown file
-        report_path = pwd / "clepon_project_report.md"
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write(report_md)
+                # Temporary files are private, give the report the usual mode
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tmp_file.name, 0o666 & ~umask)
+                os.replace(tmp_file.name, report_path)
+            except BaseException:
+                os.unlink(tmp_file.name)
+                raise
 
         console.print(f"✅ Project report saved to {report_path.resolve()}")
     except requests.RequestException as e:
@@ -1,27 +1,35 @@
+import os
 from pathlib import Path
 
 import typer
-from rich.console import Console
 
-from ..models import Project
-from ..services import (
-    find_python_files,
-    generate_project,
-    generate_tests,
-    parse_python_file,
-    run_tests,
-    vectorize_project,
-)
-
-console = Console()
-err_console = Console(stderr=True)
+from ..config import CACHE_DIR
+from ..console import get_console
 
 app = typer.Typer()
 
+# Below this many files the process pool spin-up costs more than it saves
+PARALLEL_PARSE_THRESHOLD = 25
+
 
 @app.command()
 def init():
     """Initialize the project and extract all Python functions"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    from ..models import Project
+    from ..services import (
+        FunctionCache,
+        find_python_files,
+        generate_project,
+        generate_tests,
+        parse_python_file_if_changed,
+        run_tests,
+        vectorize_project,
+    )
+
+    console = get_console()
+
     pwd = Path.cwd()
 
     # Step 1: Create project via POST /projects
@@ -32,13 +40,57 @@ def init():
     python_files = find_python_files(pwd)
     console.print(f"✅ Found {len(python_files)} Python files")
 
-    # Step 3: Extract functions from all Python files
+    # Step 3: Extract functions from all Python files, reusing the cached
+    # results of files that did not change since the last run
     all_functions = []
-    for python_file in python_files:
-        console.print(f"📄 Parsing {python_file.relative_to(pwd)}...")
-        functions = parse_python_file(python_file)
-        all_functions.extend(functions)
+    with FunctionCache(pwd / CACHE_DIR) as cache:
+        keys = [python_file.relative_to(pwd).as_posix() for python_file in python_files]
+        cached_digests = cache.digests()
+        known_digests = [cached_digests.get(key) for key in keys]
+
+        # A single worker would run the same loop, only behind a process pool
+        workers = os.cpu_count() or 1
+        if workers > 1 and len(python_files) >= PARALLEL_PARSE_THRESHOLD:
+            console.print(
+                f"📄 Parsing {len(python_files)} files with {workers} workers..."
+            )
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(
+                    executor.map(
+                        parse_python_file_if_changed,
+                        python_files,
+                        known_digests,
+                        chunksize=8,
+                    )
+                )
+        else:
+            results = []
+            for python_file, key, digest in zip(python_files, keys, known_digests):
+                result = parse_python_file_if_changed(python_file, digest)
+                # Only files that changed are parsed, the rest come from the cache
+                if result[1] is not None:
+                    console.print(f"📄 Parsed {key}")
+                results.append(result)
+
+        cached_count = 0
+        for python_file, key, (digest, functions) in zip(python_files, keys, results):
+            # Unchanged files come back without functions, load them instead
+            if functions is None:
+                functions = cache.get(key)
+                if functions is not None:
+                    cached_count += 1
+                    all_functions.extend(functions)
+                    continue
+
+                # The cached entry could not be loaded, parse the file after all
+                digest, functions = parse_python_file_if_changed(python_file)
+
+            if digest is not None:
+                cache.put(key, digest, functions)
+            all_functions.extend(functions)
 
+    if cached_count:
+        console.print(f"♻️  Reused cached functions of {cached_count} files")
     console.print(f"✅ Extracted {len(all_functions)} functions from all Python files")
 
     # Step 4: Create project data and send to vectorization API endpoint
@@ -1,3 +1,3 @@
-from .settings import API_BASE_URL, CONFIG_FILENAME
+from .settings import API_BASE_URL, CACHE_DIR, CONFIG_FILENAME
 
-__all__ = ["API_BASE_URL", "CONFIG_FILENAME"]
+__all__ = ["API_BASE_URL", "CACHE_DIR", "CONFIG_FILENAME"]
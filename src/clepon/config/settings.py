@@ -1,2 +1,3 @@
 CONFIG_FILENAME = "clepon.toml"
 API_BASE_URL = "http://127.0.0.1:8000"
+CACHE_DIR = ".clepon/cache"
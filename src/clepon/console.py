@@ -0,0 +1,21 @@
+import functools
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@functools.cache
+def get_console() -> "Console":
+    """Return the shared stdout console, importing rich on first use"""
+    from rich.console import Console
+
+    return Console()
+
+
+@functools.cache
+def get_err_console() -> "Console":
+    """Return the shared stderr console, importing rich on first use"""
+    from rich.console import Console
+
+    return Console(stderr=True)
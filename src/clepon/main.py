@@ -1,14 +1,10 @@
 from pathlib import Path
 
 import typer
-from rich.console import Console
 
 from .commands import analyze_app, init_app
 from .config import CONFIG_FILENAME
-from .services import analyze_diff, get_git_diff, read_token_from_toml, run_tests
-
-console = Console()
-err_console = Console(stderr=True)
+from .console import get_console, get_err_console
 
 app = typer.Typer()
 
@@ -25,6 +21,11 @@ def callback(ctx: typer.Context):
     if ctx.invoked_subcommand is not None:
         return
 
+    from .services import analyze_diff, get_git_diff, read_token_from_toml, run_tests
+
+    console = get_console()
+    err_console = get_err_console()
+
     console.print("🔍 Checking for new functions in latest commit...")
 
     # Step 1: Check if clepon.toml exists
@@ -1,13 +1,15 @@
-from typing import List, Optional
+from typing import Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from .function_argument import FunctionArgument
 
 
 class Function(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     id: str
     source_code: str
-    input: List[FunctionArgument]
+    input: Tuple[FunctionArgument, ...]
     output_type: Optional[str] = None
     file: str
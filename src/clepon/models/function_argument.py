@@ -1,9 +1,11 @@
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class FunctionArgument(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     id: str
     argument_name: str
     argument_type: Optional[str] = None
@@ -1,10 +1,12 @@
-from typing import List
+from typing import Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from .function import Function
 
 
 class Project(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     project_token: str
-    functions: List[Function]
+    functions: Tuple[Function, ...]
@@ -1,23 +1,48 @@
-from .project_service import (
-    analyze_diff,
-    find_python_files,
-    generate_project,
-    generate_tests,
-    get_git_diff,
-    parse_python_file,
-    read_token_from_toml,
-    run_tests,
-    vectorize_project,
-)
+import importlib
+from typing import TYPE_CHECKING
 
 __all__ = [
+    "FunctionCache",
     "analyze_diff",
     "find_python_files",
     "generate_project",
     "generate_tests",
     "get_git_diff",
-    "parse_python_file",
+    "get_session",
+    "parse_python_file_if_changed",
     "read_token_from_toml",
     "run_tests",
     "vectorize_project",
 ]
+
+if TYPE_CHECKING:
+    from .function_cache import FunctionCache
+    from .project_service import (
+        analyze_diff,
+        find_python_files,
+        generate_project,
+        generate_tests,
+        get_git_diff,
+        get_session,
+        parse_python_file_if_changed,
+        read_token_from_toml,
+        run_tests,
+        vectorize_project,
+    )
+
+
+# Exports that live outside project_service
+_MODULES = {"FunctionCache": "function_cache"}
+
+
+def __getattr__(name: str):
+    # Import the service modules (and pydantic with them) only once a service
+    # is actually used, so commands like `clepon --help` start faster
+    if name in __all__:
+        module_name = _MODULES.get(name, "project_service")
+        module = importlib.import_module(f".{module_name}", __name__)
+
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,148 @@
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from pydantic import TypeAdapter, ValidationError
+
+from ..console import get_err_console
+from ..models import Function
+
+# Bump whenever the extracted Function data changes shape or content, so
+# entries written by an older clepon are discarded instead of reused
+CACHE_VERSION = 2
+
+CACHE_FILENAME = "functions.sqlite3"
+
+_functions_adapter = TypeAdapter(List[Function])
+
+
+class FunctionCache:
+    """On-disk cache of extracted functions, keyed by file path and content
+
+    The cache is best effort: when it cannot be opened or written, a warning
+    is printed and it behaves as if empty, so every file is parsed again.
+    """
+
+    def __init__(self, directory: Path):
+        self._connection: Optional[sqlite3.Connection] = None
+        self._seen: Set[str] = set()
+
+        path = directory / CACHE_FILENAME
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._connection = _connect(path)
+        except sqlite3.OperationalError as exc:
+            # Locked or unwritable, leave the file alone and work without it
+            self._disable(exc)
+        except sqlite3.DatabaseError:
+            # Not a database or corrupt, it only holds derived data so start over
+            try:
+                for suffix in ("", "-wal", "-shm"):
+                    path.with_name(path.name + suffix).unlink(missing_ok=True)
+                self._connection = _connect(path)
+            except (sqlite3.Error, OSError) as exc:
+                self._disable(exc)
+        except OSError as exc:
+            self._disable(exc)
+
+    def __enter__(self) -> "FunctionCache":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # An interrupted run has not seen every file, pruning would wipe
+        # the entries of all the files it never reached
+        self.close(prune=exc_type is None)
+
+    def close(self, prune: bool = True):
+        """Save the stored entries, dropping those of files not seen if prune"""
+        if self._connection is None:
+            return
+        try:
+            if prune:
+                # Rows of deleted or renamed files would otherwise pile up
+                stale = [
+                    (file,)
+                    for (file,) in self._connection.execute("SELECT file FROM cache")
+                    if file not in self._seen
+                ]
+                self._connection.executemany("DELETE FROM cache WHERE file = ?", stale)
+            self._connection.commit()
+        except sqlite3.Error as exc:
+            self._disable(exc)
+        finally:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def digests(self) -> Dict[str, str]:
+        """Return the content digest stored for each cached file"""
+        if self._connection is None:
+            return {}
+        try:
+            return dict(self._connection.execute("SELECT file, sha FROM cache"))
+        except sqlite3.Error as exc:
+            self._disable(exc)
+            return {}
+
+    def get(self, file: str) -> Optional[List[Function]]:
+        """Return the cached functions of file, or None if there are none"""
+        if self._connection is None:
+            return None
+        try:
+            row = self._connection.execute(
+                "SELECT payload FROM cache WHERE file = ?", (file,)
+            ).fetchone()
+        except sqlite3.Error as exc:
+            self._disable(exc)
+            return None
+        if row is None:
+            return None
+
+        try:
+            functions = _functions_adapter.validate_json(row[0])
+        except ValidationError:
+            return None
+        self._seen.add(file)
+        return functions
+
+    def put(self, file: str, digest: str, functions: List[Function]):
+        """Store the functions extracted from file, replacing its old entry"""
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (file, sha, payload) VALUES (?, ?, ?)",
+                (file, digest, _functions_adapter.dump_json(functions)),
+            )
+        except sqlite3.Error as exc:
+            self._disable(exc)
+            return
+        self._seen.add(file)
+
+    def _disable(self, exc: Exception):
+        get_err_console().print(
+            f"⚠️  Function cache unavailable, continuing without it: {exc}"
+        )
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+
+        (version,) = connection.execute("PRAGMA user_version").fetchone()
+        if version != CACHE_VERSION:
+            connection.execute("DROP TABLE IF EXISTS cache")
+            connection.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        # One row per file, keyed by its path relative to the project root
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "file TEXT PRIMARY KEY, sha TEXT NOT NULL, payload BLOB NOT NULL)"
+        )
+    except BaseException:
+        connection.close()
+        raise
+    return connection
@@ -1,21 +1,78 @@
 import ast
-import subprocess
+import functools
+import hashlib
+import os
+import re
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
 
-import requests
-import toml
 import typer
-from rich.console import Console
 
 from ..config import API_BASE_URL, CONFIG_FILENAME
+from ..console import get_console, get_err_console
 from ..models import Function, FunctionArgument, Project
 
-console = Console()
-err_console = Console(stderr=True)
+if TYPE_CHECKING:
+    import requests
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+# Node types that can hold statements, expressions never contain a def
+_STATEMENT_NODES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+# compile() flags equivalent to ast.parse(mode="exec"), without its wrapper
+_PARSE_FLAGS = ast.PyCF_ONLY_AST
+
+# Characters that must be escaped inside a TOML basic string
+_TOML_CONTROL_RE = re.compile(r"[\x00-\x08\x0a-\x1f\x7f]")
+
+# A full SHA-1 or SHA-256 object id as printed by git rev-parse
+_OBJECT_ID_RE = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+
+# Rendered complex annotations (Optional[str], List[Path], ...) by source text
+_UNPARSE_CACHE: Dict[str, str] = {}
+
+# Line terminators recognised by the ast module when mapping node positions
+_NEWLINE_RE = re.compile(r"\r\n|\r|\n")
+
+
+@functools.cache
+def get_session() -> "requests.Session":
+    """Return the shared HTTP session used for every Clepon API call"""
+    import requests
+    from requests.adapters import HTTPAdapter, Retry
+
+    # A single session keeps connections to the API alive between requests
+    # instead of opening a new one (and redoing the TLS handshake) per call.
+    # Every API call is a POST that creates or starts work on the server, so
+    # only failures to connect, where nothing was sent yet, are retried
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=3, connect=3, read=0, other=0, status=0, backoff_factor=0.3
+        ),
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+def _toml_string(value: str) -> str:
+    """Quote value as a TOML basic string"""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    escaped = _TOML_CONTROL_RE.sub(lambda m: f"\\u{ord(m.group()):04X}", escaped)
+    return f'"{escaped}"'
 
 
 def generate_project() -> str:
+    import requests
+
+    console = get_console()
+    err_console = get_err_console()
+
     pwd = Path.cwd()
     config_path = pwd / CONFIG_FILENAME
 
@@ -28,10 +85,9 @@ def generate_project() -> str:
     console.print(f"📁 Project name: {project_name}")
 
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/projects",
             json={"name": project_name},
-            headers={"Content-Type": "application/json"},
             timeout=30,
         )
         response.raise_for_status()
@@ -41,9 +97,13 @@ def generate_project() -> str:
         console.print(f"✅ Created project with ID: {project_id[:20]}...")
 
         # Store project_id in TOML configuration
-        config = {"project": {"id": project_id, "name": project_name}}
-        with open(config_path, "w", encoding="utf-8") as config_file:
-            toml.dump(config, config_file)
+        # The file only ever holds these two keys, write it directly
+        config_path.write_text(
+            "[project]\n"
+            f"id = {_toml_string(project_id)}\n"
+            f"name = {_toml_string(project_name)}\n",
+            encoding="utf-8",
+        )
         console.print(f"✅ Stored project configuration in {config_path}")
 
         return project_id
@@ -71,56 +131,125 @@ def generate_project() -> str:
 
 def read_token_from_toml(config_path: Path) -> str:
     """Read the project token from the .toml file"""
-    with open(config_path, "r", encoding="utf-8") as f:
-        config = toml.load(f)
+    import tomllib
+
+    with open(config_path, "rb") as f:
+        config = tomllib.load(f)
     return config["project"]["id"]
 
 
 def find_python_files(directory: Path) -> List[Path]:
-    files = directory.rglob("*.py")
-    return [
-        f
-        for f in files
-        if not any(part.startswith(".") for part in f.relative_to(directory).parts)
-    ]
-
-
-def extract_function_info_from_file(node: ast.FunctionDef, filepath: str) -> Function:
+    """Find all Python files under directory, skipping hidden files and folders"""
+    python_files = []
+    pending = [directory]
+
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            # Unreadable directories are skipped, as Path.rglob does
+            continue
+
+        with entries:
+            for entry in entries:
+                # Prune hidden folders (.git, .venv, ...) before descending
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(".py"):
+                    python_files.append(Path(entry.path))
+
+    return python_files
+
+
+def _iter_functions(node: ast.AST) -> Iterator[FunctionNode]:
+    """Yield every (possibly nested) function definition under node"""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield child
+        if isinstance(child, _STATEMENT_NODES):
+            yield from _iter_functions(child)
+
+
+def _line_offsets(source: str) -> List[int]:
+    """Return the offset in source at which each line starts"""
+    offsets = [0]
+    offsets.extend(match.end() for match in _NEWLINE_RE.finditer(source))
+    return offsets
+
+
+def _char_offset(
+    source: str, line_offsets: List[int], lineno: int, col_offset: int
+) -> int:
+    """Convert an AST (line, UTF-8 byte column) position into a str offset"""
+    start = line_offsets[lineno - 1]
+    end = line_offsets[lineno] if lineno < len(line_offsets) else len(source)
+    line = source[start:end]
+    if line.isascii():
+        return start + col_offset
+    return start + len(line.encode("utf-8")[:col_offset].decode("utf-8"))
+
+
+def _source_segment(source: str, line_offsets: List[int], node: ast.AST) -> str:
+    """Slice the source code of node, like ast.get_source_segment"""
+    start = _char_offset(source, line_offsets, node.lineno, node.col_offset)
+    end = _char_offset(source, line_offsets, node.end_lineno, node.end_col_offset)
+    return source[start:end]
+
+
+def _annotation_to_str(
+    annotation: ast.expr, source: str, line_offsets: List[int]
+) -> str:
+    """Render an annotation, skipping ast.unparse for the common simple shapes"""
+    if isinstance(annotation, ast.Name):
+        return annotation.id
+    if isinstance(annotation, ast.Attribute) and isinstance(annotation.value, ast.Name):
+        return f"{annotation.value.id}.{annotation.attr}"
+    if isinstance(annotation, ast.Constant) and annotation.value is None:
+        return "None"
+
+    # The same source text always parses to the same expression, so it keys
+    # the unparse cache; slicing it is far cheaper than ast.dump
+    key = _source_segment(source, line_offsets, annotation)
+    rendered = _UNPARSE_CACHE.get(key)
+    if rendered is None:
+        rendered = _UNPARSE_CACHE[key] = ast.unparse(annotation)
+    return rendered
+
+
+def extract_function_info_from_file(
+    node: FunctionNode, filename: str, source: str, line_offsets: List[int]
+) -> Function:
     """Extract function information from an AST node"""
     # Generate unique identifier for the function
-    filename = Path(filepath).name
-
     func_id = f"{filename}:{node.name}:{node.lineno}"
 
     # Extract source code
-    with open(filepath, "r", encoding="utf-8") as file:
-        source = file.read()
-
-    source_lines = ast.get_source_segment(source, node)
-
-    if source_lines is None:
-        # Fallback: try to reconstruct
-        source_lines = ast.unparse(node)
-
-    # Extract arguments
-    arguments = []
-    for i, arg in enumerate(node.args.args):
-        arg_type = None
-        if arg.annotation:
-            arg_type = ast.unparse(arg.annotation)
-
-        arguments.append(
-            FunctionArgument(
-                id=f"{func_id}:arg:{i}", argument_name=arg.arg, argument_type=arg_type
-            )
+    source_lines = _source_segment(source, line_offsets, node)
+
+    # Every field comes straight from the AST as a str (or None), so the
+    # models are built with model_construct, skipping pydantic validation
+    arg_id_prefix = f"{func_id}:arg:"
+    arguments = tuple(
+        FunctionArgument.model_construct(
+            id=arg_id_prefix + str(i),
+            argument_name=arg.arg,
+            argument_type=(
+                _annotation_to_str(arg.annotation, source, line_offsets)
+                if arg.annotation
+                else None
+            ),
         )
+        for i, arg in enumerate(node.args.args)
+    )
 
     # Extract return type
     output_type = None
     if node.returns:
-        output_type = ast.unparse(node.returns)
+        output_type = _annotation_to_str(node.returns, source, line_offsets)
 
-    return Function(
+    return Function.model_construct(
         id=func_id,
         source_code=source_lines,
         input=arguments,
@@ -129,34 +258,68 @@ def extract_function_info_from_file(node: ast.FunctionDef, filepath: str) -> Fun
     )
 
 
-def parse_python_file(filepath: Path) -> List[Function]:
-    """Parse a Python file and extract all function definitions"""
-    functions = []
+def parse_python_file_if_changed(
+    filepath: Path, cached_digest: Optional[str] = None
+) -> Tuple[Optional[str], Optional[List[Function]]]:
+    """Hash a Python file and extract its functions unless it is unchanged
 
+    Returns the SHA-256 digest of the file (None if it could not be read),
+    and its functions, or None when the digest equals cached_digest.
+    """
     try:
-        with open(filepath, "r", encoding="utf-8") as file:
-            content = file.read()
+        data = filepath.read_bytes()
+    except OSError as exc:
+        get_err_console().print(f"[red]Error parsing {filepath}: {exc}[/red]")
+        return None, []
 
-        tree = ast.parse(content, filename=str(filepath))
+    # Hash the very bytes that get parsed, so the digest matches the functions
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == cached_digest:
+        return digest, None
 
-        # Walk through all nodes in the AST
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                func_info = extract_function_info_from_file(node, str(filepath))
-                functions.append(func_info)
+    # Same newline translation as reading the file in text mode
+    content = data.decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
 
-    except OSError as exc:
-        err_console.print(f"[red]Error parsing {filepath}: {exc}[/red]")
+    return digest, _functions_from_source(filepath, content)
+
+
+def _functions_from_source(filepath: Path, content: str) -> List[Function]:
+    functions = []
+
+    # Files without the def keyword cannot define functions, skip parsing
+    if "def" not in content:
+        return functions
+
+    tree = compile(content, str(filepath), "exec", _PARSE_FLAGS, dont_inherit=True)
+
+    # Index line starts once so each function is an O(1) slice
+    filename = filepath.name
+    line_offsets = _line_offsets(content)
+
+    # Includes methods and nested functions
+    for node in _iter_functions(tree):
+        func_info = extract_function_info_from_file(
+            node, filename, content, line_offsets
+        )
+        functions.append(func_info)
 
     return functions
 
 
 def vectorize_project(project_data: Project):
+    import requests
+
+    console = get_console()
+    err_console = get_err_console()
+
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/projects/vectorize",
-            json=project_data.model_dump(),
-            headers={"Content-Type": "application/json"},
+            # Let pydantic-core emit the JSON body instead of dumping a dict
+            # tree and re-encoding it with the stdlib json module
+            data=project_data.model_dump_json().encode("utf-8"),
             timeout=60,
         )
         response.raise_for_status()
@@ -190,18 +353,42 @@ def vectorize_project(project_data: Project):
         raise typer.Exit(1) from exc
 
 
+def write_test_files(tests_dir: Path, tests: Dict[str, Dict[str, str]]):
+    """Write the generated test files returned by the API into tests_dir"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    console = get_console()
+
+    def write(filename: str, test_file: Dict[str, str]):
+        (tests_dir / filename).write_bytes(test_file["content"].encode("utf-8"))
+
+    # Overlap the writes, there can be dozens of generated files
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(write, tests.keys(), tests.values()))
+
+    if tests:
+        console.print(
+            "\n".join(f"📝 Wrote test file: tests/{filename}" for filename in tests),
+            markup=False,
+        )
+
+
 def generate_tests(project_id: str):
+    import requests
+
+    console = get_console()
+    err_console = get_err_console()
+
     pwd = Path.cwd()
 
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/test-generator/{project_id}/generate",
             json={
                 "llm_provider": "gemini",
                 "llm_model": "gemini-2.0-flash",
                 "temperature": 0.7,
             },
-            headers={"Content-Type": "application/json"},
             timeout=1800,  # 30 minutes for test generation
         )
         response.raise_for_status()
@@ -215,11 +402,7 @@ def generate_tests(project_id: str):
         tests_dir = pwd / "tests"
         tests_dir.mkdir(exist_ok=True)
 
-        for filename, test_file in test_results["tests"].items():
-            test_path = tests_dir / filename
-            with open(test_path, "w", encoding="utf-8") as f:
-                f.write(test_file["content"])
-            console.print(f"📝 Wrote test file: tests/{filename}")
+        write_test_files(tests_dir, test_results["tests"])
 
         console.print(f"✅ All test files written to {tests_dir}")
 
@@ -250,6 +433,11 @@ def generate_tests(project_id: str):
 
 
 def run_tests():
+    import subprocess
+
+    console = get_console()
+    err_console = get_err_console()
+
     pwd = Path.cwd()
 
     try:
@@ -280,57 +468,77 @@ def run_tests():
     console.print("\n🎉 Initialization complete!")
 
 
-def get_git_diff() -> str:
-    """Get the git diff of the latest commit"""
-    # First check if we're in a git repository
-    try:
-        subprocess.run(
-            ["git", "rev-parse", "--git-dir"], capture_output=True, check=True
-        )
+def check_git_history():
+    """Check that the latest commit has a parent to diff against"""
+    import subprocess
+
+    console = get_console()
 
-    except subprocess.CalledProcessError as exc:
+    # One rev-parse answers all three checks: it prints the git dir, then the
+    # id of each revision it resolves, and stops at the first one it cannot
+    result = subprocess.run(
+        ["git", "rev-parse", "--git-dir", "HEAD", "HEAD~1"],
+        capture_output=True,
+        text=True,
+    )
+    lines = result.stdout.split()
+    commit_count = sum(1 for line in lines[1:] if _OBJECT_ID_RE.fullmatch(line))
+
+    # First check if we're in a git repository
+    if not lines:
         console.print("❌ Error: Not a git repository!")
         console.print("Please initialize git first: git init")
-        raise typer.Exit(1) from exc
+        raise typer.Exit(1)
 
     # Check if there are any commits
-    try:
-        subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, check=True)
-
-    except subprocess.CalledProcessError as exc:
+    if commit_count == 0:
         console.print("❌ Error: No commits found in repository!")
         console.print("Please make at least one commit first.")
-        raise typer.Exit(1) from exc
+        raise typer.Exit(1)
 
     # Check if there's a previous commit (HEAD~1)
-    try:
-        subprocess.run(["git", "rev-parse", "HEAD~1"], capture_output=True, check=True)
-
-    except subprocess.CalledProcessError as exc:
+    if commit_count == 1:
         console.print("❌ Error: Only one commit exists!")
         console.print("Please make at least one more commit to compare.")
         console.print("Alternatively, use 'git diff HEAD' to see uncommitted changes.")
-        raise typer.Exit(1) from exc
-    # Now get the actual diff
-    try:
-        result = subprocess.run(
-            ["git", "diff", "HEAD~1", "HEAD"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        console.print(f"❌ Error running git diff: {e}")
-        console.print(f"stderr: {e.stderr if hasattr(e, 'stderr') else 'N/A'}")
         raise typer.Exit(1)
 
 
+def get_git_diff() -> str:
+    """Get the git diff of the latest commit"""
+    import subprocess
+
+    console = get_console()
+
+    # Run the diff straight away, the repository is only inspected when it
+    # fails so the happy path costs a single git process
+    result = subprocess.run(
+        # Plain output only, the diff is consumed by the API, not displayed
+        ["git", "diff", "--no-color", "--no-ext-diff", "HEAD~1", "HEAD", "--"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode == 0:
+        return result.stdout
+
+    # Report the specific reason when the repository state explains it
+    check_git_history()
+
+    console.print(f"❌ Error running git diff (exit code: {result.returncode})")
+    console.print(f"stderr: {result.stderr}")
+    raise typer.Exit(1)
+
+
 def analyze_diff(project_id: str, diff_output: str):
+    import requests
+
+    console = get_console()
+    err_console = get_err_console()
+
     pwd = Path.cwd()
 
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/commit-analyzer/{project_id}/analyze",
             json={
                 "diff_text": diff_output,
@@ -338,7 +546,6 @@ def analyze_diff(project_id: str, diff_output: str):
                 "llm_model": "gemini-2.0-flash",
                 "temperature": 0.7,
             },
-            headers={"Content-Type": "application/json"},
             timeout=1800,  # 30 minutes for analysis
         )
         response.raise_for_status()
@@ -352,11 +559,7 @@ def analyze_diff(project_id: str, diff_output: str):
         tests_dir = pwd / "tests"
         tests_dir.mkdir(exist_ok=True)
 
-        for filename, test_file in test_results["tests"].items():
-            test_path = tests_dir / filename
-            with open(test_path, "w", encoding="utf-8") as f:
-                f.write(test_file["content"])
-            console.print(f"📝 Wrote test file: tests/{filename}")
+        write_test_files(tests_dir, test_results["tests"])
 
         console.print(f"✅ All test files written to {tests_dir}")
 
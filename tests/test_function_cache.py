@@ -0,0 +1,114 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from clepon.models import Function
+from clepon.services.function_cache import CACHE_FILENAME, FunctionCache
+
+
+def make_function(name: str) -> Function:
+    return Function(
+        id=f"a.py:{name}:1",
+        source_code=f"def {name}(): pass",
+        input=(),
+        output_type=None,
+        file="a.py",
+    )
+
+
+class FunctionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name) / "cache"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip(self):
+        functions = [make_function("f"), make_function("g")]
+        with FunctionCache(self.directory) as cache:
+            cache.put("pkg/a.py", "sha-1", functions)
+
+        with FunctionCache(self.directory) as cache:
+            self.assertEqual(cache.digests(), {"pkg/a.py": "sha-1"})
+            self.assertEqual(cache.get("pkg/a.py"), functions)
+            self.assertIsNone(cache.get("pkg/b.py"))
+
+    def test_put_replaces_entry_of_changed_file(self):
+        with FunctionCache(self.directory) as cache:
+            cache.put("a.py", "sha-1", [make_function("f")])
+        with FunctionCache(self.directory) as cache:
+            cache.put("a.py", "sha-2", [make_function("g")])
+
+        with FunctionCache(self.directory) as cache:
+            self.assertEqual(cache.digests(), {"a.py": "sha-2"})
+            self.assertEqual(cache.get("a.py"), [make_function("g")])
+
+    def test_close_prunes_files_not_seen(self):
+        with FunctionCache(self.directory) as cache:
+            cache.put("kept.py", "sha-1", [])
+            cache.put("deleted.py", "sha-2", [])
+
+        with FunctionCache(self.directory) as cache:
+            cache.get("kept.py")
+
+        with FunctionCache(self.directory) as cache:
+            self.assertEqual(cache.digests(), {"kept.py": "sha-1"})
+
+    def test_error_inside_with_block_keeps_entries(self):
+        with FunctionCache(self.directory) as cache:
+            cache.put("a.py", "sha-1", [])
+            cache.put("b.py", "sha-2", [])
+
+        with self.assertRaises(SyntaxError):
+            with FunctionCache(self.directory) as cache:
+                cache.put("c.py", "sha-3", [])
+                raise SyntaxError("invalid syntax")
+
+        with FunctionCache(self.directory) as cache:
+            self.assertEqual(
+                cache.digests(), {"a.py": "sha-1", "b.py": "sha-2", "c.py": "sha-3"}
+            )
+
+    def test_corrupt_database_is_recreated(self):
+        self.directory.mkdir()
+        (self.directory / CACHE_FILENAME).write_bytes(b"not a database")
+
+        with FunctionCache(self.directory) as cache:
+            self.assertEqual(cache.digests(), {})
+            cache.put("a.py", "sha-1", [])
+
+        with FunctionCache(self.directory) as cache:
+            self.assertEqual(cache.digests(), {"a.py": "sha-1"})
+
+    def test_locked_database_is_skipped(self):
+        with FunctionCache(self.directory) as cache:
+            cache.put("a.py", "sha-1", [])
+
+        lock = sqlite3.connect(self.directory / CACHE_FILENAME, timeout=0)
+        lock.execute("BEGIN EXCLUSIVE")
+        try:
+            cache = FunctionCache(self.directory)
+            cache.put("b.py", "sha-2", [])
+            self.assertIsNone(cache.get("a.py"))
+            cache.close()
+        finally:
+            lock.rollback()
+            lock.close()
+
+        # The existing entries are left intact for the next run
+        with FunctionCache(self.directory) as cache:
+            self.assertEqual(cache.digests(), {"a.py": "sha-1"})
+
+    def test_unusable_directory_is_skipped(self):
+        self.directory.write_text("a file, not a directory")
+
+        with FunctionCache(self.directory) as cache:
+            self.assertEqual(cache.digests(), {})
+            self.assertIsNone(cache.get("a.py"))
+            cache.put("a.py", "sha-1", [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,249 @@
+import ast
+import hashlib
+import subprocess
+import tempfile
+import textwrap
+import tomllib
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import typer
+
+from clepon.services.project_service import (
+    _annotation_to_str,
+    _iter_functions,
+    _line_offsets,
+    _source_segment,
+    _toml_string,
+    check_git_history,
+    parse_python_file_if_changed,
+)
+
+SHA1_ID = "a" * 40
+SHA256_ID = "b" * 64
+
+
+class TomlStringTest(unittest.TestCase):
+    def assertRoundTrips(self, value: str):
+        document = tomllib.loads(f"value = {_toml_string(value)}")
+        self.assertEqual(document["value"], value)
+
+    def test_plain(self):
+        self.assertEqual(_toml_string("clepon"), '"clepon"')
+
+    def test_quotes_and_backslashes(self):
+        self.assertRoundTrips('say "hi" \\ C:\\path')
+
+    def test_control_characters(self):
+        self.assertRoundTrips("tab\there\nnew line\x00\x1f\x7f")
+
+    def test_non_ascii(self):
+        self.assertRoundTrips("proyek-ñame ✓")
+
+
+class SourceSegmentTest(unittest.TestCase):
+    def assertSegmentsMatch(self, source: str):
+        line_offsets = _line_offsets(source)
+        for node in ast.walk(ast.parse(source)):
+            if isinstance(node, (ast.expr, ast.stmt)):
+                self.assertEqual(
+                    _source_segment(source, line_offsets, node),
+                    ast.get_source_segment(source, node),
+                )
+
+    def test_ascii(self):
+        self.assertSegmentsMatch("def f(a: int, b: str) -> None:\n    return a\n")
+
+    def test_multibyte_columns(self):
+        # Column offsets count UTF-8 bytes, not characters
+        self.assertSegmentsMatch(
+            "def f(x='é✓', y: 'ünïcode' = 1):\n    return {'😀': x, 'y': y}\n"
+        )
+
+    def test_multiline_node(self):
+        self.assertSegmentsMatch("x = [\n    'ä',\n    'b',\n]\ny = 1\n")
+
+    def test_form_feed_and_carriage_return(self):
+        self.assertSegmentsMatch("a = 1\rb = 'é'\r\nc = \x0c2\n")
+
+
+class IterFunctionsTest(unittest.TestCase):
+    def assertFindsWalkFunctions(self, source: str):
+        tree = ast.parse(source)
+        walked = [
+            node
+            for node in ast.walk(tree)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+        # Same nodes as ast.walk, in source order rather than breadth first
+        walked.sort(key=lambda node: (node.lineno, node.col_offset))
+        self.assertEqual(list(_iter_functions(tree)), walked)
+
+    def test_nested_definitions(self):
+        source = textwrap.dedent(
+            """
+            async def coroutine():
+                async def inner():
+                    pass
+
+            class Outer:
+                def method(self):
+                    def closure():
+                        def deepest():
+                            pass
+
+                class Inner:
+                    @staticmethod
+                    async def static():
+                        pass
+
+            if True:
+                def under_if():
+                    pass
+            else:
+                def under_else():
+                    pass
+
+            try:
+                def under_try():
+                    pass
+            except ValueError:
+                def under_except():
+                    pass
+            finally:
+                def under_finally():
+                    pass
+
+            match command:
+                case [x]:
+                    def under_case():
+                        pass
+
+            with context():
+                for item in items:
+                    while item:
+                        def under_loops():
+                            pass
+
+            value = lambda: [None for _ in range(3)]
+            """
+        )
+        self.assertFindsWalkFunctions(source)
+        self.assertEqual(
+            [node.name for node in _iter_functions(ast.parse(source))],
+            [
+                "coroutine",
+                "inner",
+                "method",
+                "closure",
+                "deepest",
+                "static",
+                "under_if",
+                "under_else",
+                "under_try",
+                "under_except",
+                "under_finally",
+                "under_case",
+                "under_loops",
+            ],
+        )
+
+    def test_stdlib_modules(self):
+        for module in (ast, tempfile, unittest.case, mock):
+            with self.subTest(module=module.__name__):
+                self.assertFindsWalkFunctions(Path(module.__file__).read_text())
+
+
+class AnnotationToStrTest(unittest.TestCase):
+    ANNOTATIONS = [
+        "int",
+        "None",
+        "os.PathLike",
+        "a.b.c",
+        "'Forward'",
+        "Optional[str]",
+        "Optional[ str ]",
+        "List[int] | None",
+        "Dict[str, List[Path]]",
+        "Callable[..., Awaitable[None]]",
+        "Literal['é', 1, True]",
+        "typing.Tuple[int, ...]",
+        "x.y[z]",
+    ]
+
+    def test_matches_unparse(self):
+        for annotation in self.ANNOTATIONS:
+            source = f"def f(a: {annotation}) -> {annotation}: pass\n"
+            line_offsets = _line_offsets(source)
+            function = ast.parse(source).body[0]
+            for node in (function.args.args[0].annotation, function.returns):
+                # Twice, so both the first rendering and the cached one are checked
+                for _ in range(2):
+                    with self.subTest(annotation=annotation):
+                        self.assertEqual(
+                            _annotation_to_str(node, source, line_offsets),
+                            ast.unparse(node),
+                        )
+
+
+class ParsePythonFileIfChangedTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "mod.py"
+        self.data = b"def f(a: int) -> str:\r\n    return 'a'\r\n"
+        self.path.write_bytes(self.data)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_parses_and_returns_digest(self):
+        digest, functions = parse_python_file_if_changed(self.path)
+
+        self.assertEqual(digest, hashlib.sha256(self.data).hexdigest())
+        self.assertEqual([function.id for function in functions], ["mod.py:f:1"])
+        # Newlines are translated like a text mode read
+        self.assertEqual(
+            functions[0].source_code, "def f(a: int) -> str:\n    return 'a'"
+        )
+
+    def test_unchanged_file_is_not_parsed(self):
+        digest = hashlib.sha256(self.data).hexdigest()
+        self.assertEqual(
+            parse_python_file_if_changed(self.path, digest), (digest, None)
+        )
+
+    def test_missing_file(self):
+        self.path.unlink()
+        self.assertEqual(parse_python_file_if_changed(self.path), (None, []))
+
+
+class CheckGitHistoryTest(unittest.TestCase):
+    def check(self, stdout: str):
+        completed = subprocess.CompletedProcess([], 128, stdout=stdout, stderr="")
+        with mock.patch.object(subprocess, "run", return_value=completed) as run:
+            check_git_history()
+        run.assert_called_once()
+
+    def test_not_a_repository(self):
+        with self.assertRaises(typer.Exit):
+            self.check("")
+
+    def test_no_commits(self):
+        # rev-parse echoes revisions it cannot resolve and stops there
+        with self.assertRaises(typer.Exit):
+            self.check(".git\nHEAD\n")
+
+    def test_single_commit(self):
+        with self.assertRaises(typer.Exit):
+            self.check(f".git\n{SHA1_ID}\nHEAD~1\n")
+
+    def test_two_commits(self):
+        self.check(f".git\n{SHA1_ID}\n{SHA1_ID}\n")
+
+    def test_sha256_repository(self):
+        self.check(f"/repo/.git\n{SHA256_ID}\n{SHA256_ID}\n")
+
+
+if __name__ == "__main__":
+    unittest.main()